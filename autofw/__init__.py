@@ -1,13 +1,15 @@
-from autofw.browser import Browser, BrowserConfig
+from autofw.browser import Browser, BrowserConfig, should_block
 from autofw.delays import DELAYS, SPEED_PROFILES, DelayProfile, random_delay
 from autofw.email import GmailClient, GmailConfig
 from autofw.mouse import HumanMouse, MouseConfig
+from autofw.pool import BrowserPool
 from autofw.retry import RetryConfig, retry
 from autofw.typing import TypingConfig, human_type
 
 __all__ = [
     "Browser",
     "BrowserConfig",
+    "should_block",
     "DelayProfile",
     "DELAYS",
     "SPEED_PROFILES",
@@ -16,6 +18,7 @@ __all__ = [
     "GmailConfig",
     "HumanMouse",
     "MouseConfig",
+    "BrowserPool",
     "RetryConfig",
     "retry",
     "TypingConfig",
@@ -1,20 +1,35 @@
 import asyncio
+import fnmatch
+import json
+import logging
 import random
+import re
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable
+from urllib.parse import urlsplit
 
 import nodriver as uc
+import nodriver.cdp.browser as cdp_browser
+import nodriver.cdp.fetch as cdp_fetch
 import nodriver.cdp.input_ as cdp_input
 import nodriver.cdp.network as cdp_network
+import nodriver.cdp.page as cdp_page
+import nodriver.cdp.target as cdp_target
+import numpy as np
 
 from autofw.delays import DelayProfile, random_delay
 from autofw.mouse import HumanMouse, MouseConfig
 from autofw.retry import RetryConfig, retry
 from autofw.typing import TypingConfig, human_type
 
-CURSOR_INJECT_JS = """(function(){if(document.getElementById('__debug_cursor__'))return;const c=document.createElement('div');c.id='__debug_cursor__';c.style.cssText='position:fixed;width:12px;height:12px;background:rgba(255,50,50,0.8);border:2px solid white;border-radius:50%;pointer-events:none;z-index:999999;transform:translate(-50%,-50%);box-shadow:0 0 4px rgba(0,0,0,0.5);transition:none';document.body.appendChild(c)})();"""
+logger = logging.getLogger(__name__)
+
+CURSOR_INJECT_JS = """(function(){window.__dbgMove=function(pts){const c=document.getElementById('__debug_cursor__');if(!c||!pts.length)return;const t0=performance.now();let i=0;(function step(now){while(i<pts.length-1&&pts[i+1][2]<=now-t0)i++;c.style.left=pts[i][0]+'px';c.style.top=pts[i][1]+'px';if(i<pts.length-1)requestAnimationFrame(step)})(t0)};if(document.getElementById('__debug_cursor__'))return;const c=document.createElement('div');c.id='__debug_cursor__';c.style.cssText='position:fixed;width:12px;height:12px;background:rgba(255,50,50,0.8);border:2px solid white;border-radius:50%;pointer-events:none;z-index:999999;transform:translate(-50%,-50%);box-shadow:0 0 4px rgba(0,0,0,0.5);transition:none';document.body.appendChild(c)})();"""
 CURSOR_MOVE_JS = "(function(x,y){const c=document.getElementById('__debug_cursor__');if(c){c.style.left=x+'px';c.style.top=y+'px'}})(%s,%s);"
 
+# Path steps shorter than this are folded into the next sleep rather than each costing a loop iteration
+MIN_MOVE_SLEEP_MS = 2.0
+
 DEFAULT_BROWSER_ARGS = [
     "--disable-remote-fonts",
     "--disable-background-networking",
@@ -46,6 +61,25 @@ DEFAULT_BLOCKED_PATTERNS = [
 ]
 
 
+def _compile_blocklist(patterns: list[str]) -> re.Pattern:
+    """Compile URL globs into one case-insensitive alternation, so a URL is checked in a single regex pass."""
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+
+
+def _blocklist_matches(blocklist: re.Pattern, url: str) -> bool:
+    # Match host + path only, so a query string or fragment can't hide a blocked extension
+    parts = urlsplit(url)
+    return blocklist.fullmatch(f"{parts.hostname or ''}{parts.path}") is not None
+
+
+_BLOCKED_RE = _compile_blocklist(DEFAULT_BLOCKED_PATTERNS)
+
+
+def should_block(url: str) -> bool:
+    """Return True if url matches one of DEFAULT_BLOCKED_PATTERNS (on host + path, ignoring case)."""
+    return _blocklist_matches(_BLOCKED_RE, url)
+
+
 @dataclass(frozen=True)
 class BrowserConfig:
     headless: bool = False
@@ -69,6 +103,9 @@ class Browser:
         self.retry_config = retry_config or RetryConfig()
         self.delay_profile = delay_profile or DelayProfile(speed_multiplier=self.config.speed)
 
+        # One generator for click jitter and mouse paths, so each draws its values in a single call
+        self._rng = np.random.default_rng()
+
         mouse_cfg = mouse_config or MouseConfig()
         adjusted_speed = mouse_cfg.speed_factor * (1 / self.config.speed)
         self.mouse = HumanMouse(
@@ -80,15 +117,41 @@ class Browser:
                 variance_factor=mouse_cfg.variance_factor,
                 max_variance=mouse_cfg.max_variance,
                 points_per_path=mouse_cfg.points_per_path,
-            )
+            ),
+            rng=self._rng,
         )
 
         self.cursor_x: float = 0
         self.cursor_y: float = 0
         self.browser: uc.Browser | None = None
         self.tab: uc.Tab | None = None
+        self._context_id: cdp_browser.BrowserContextID | None = None
+        self._attached = False
+        self._should_block: Callable[[str], bool] = should_block
+        # Set by block_resources(), so every tab this instance opens later is filtered too
+        self._blocked_patterns: list[str] | None = None
+        self._blocking = False
+
+    @property
+    def cdp_url(self) -> str | None:
+        """host:port of the running browser's DevTools endpoint, for other instances to attach to."""
+        if not self.browser:
+            return None
+        return f"{self.browser.config.host}:{self.browser.config.port}"
+
+    async def start(self, cdp_url: str | None = None) -> None:
+        """Launch a browser, or attach to the one at cdp_url and work in a new context inside it."""
+        if cdp_url:
+            # Accept both host:port and a ws://host:port/devtools/... URL
+            parts = urlsplit(cdp_url if "//" in cdp_url else f"//{cdp_url}")
+            self.browser = await uc.start(host=parts.hostname, port=parts.port)
+            self._attached = True
+            self.tab = await self.new_context()
+            self._context_id = self.tab.target.browser_context_id
+            await self._apply_window_bounds()
+            self.cursor_x, self.cursor_y = random.uniform(100, 400), random.uniform(100, 300)
+            return
 
-    async def start(self) -> None:
         x, y = self.config.window_position
         w, h = self.config.window_size
         browser_args = [
@@ -103,24 +166,67 @@ class Browser:
     async def stop(self) -> None:
         if not self.browser:
             return
+        if self._attached:
+            # The browser process belongs to whoever launched it; only drop our context and connection
+            if self._context_id is not None:
+                await self.close_context(self._context_id)
+            try:
+                await self.browser.connection.aclose()
+            except Exception:
+                pass
+            self.browser, self.tab, self._context_id = None, None, None
+            self._attached = False
+            return
         try:
             self.browser.stop()
         except Exception:
             pass
         await asyncio.sleep(1)
-        self.browser, self.tab = None, None
+        self.browser, self.tab, self._context_id = None, None, None
 
     async def navigate(self, url: str, use_proxy: bool = False) -> uc.Tab:
         """Navigate to a URL, optionally using proxy."""
         if use_proxy and self.config.proxy:
-            if self.browser.tabs:
-                await self.browser.tabs[0].close()
-            self.tab = await self.browser.create_context(url=url, proxy_server=self.config.proxy)
+            # Swap in a fresh context rather than closing the default tab, which keeps the browser alive
+            if self._context_id is not None:
+                await self.close_context(self._context_id)
+            self.tab = await self.new_context(url, proxy=self.config.proxy)
+            self._context_id = self.tab.target.browser_context_id
+            if self._attached:
+                await self._apply_window_bounds()
+        elif self._context_id is not None:
+            # browser.get() always drives the first tab, which isn't ours once we own a context
+            # (always when attached, and after a proxied navigate when launched)
+            await self.tab.send(cdp_page.navigate(url))
+            await self.tab
         else:
-            self.tab = await self.browser.get(url)
+            previous, self.tab = self.tab, await self.browser.get(url)
+            if self._blocking and self.tab is not previous:
+                await self._enable_blocking(self.tab)
         await self._inject_debug_cursor()
         return self.tab
 
+    async def new_context(self, url: str = "about:blank", proxy: str | None = None) -> uc.Tab:
+        """Open a tab in a new browser context, isolated from other contexts but sharing this browser process."""
+        if not self._blocking:
+            return await self.browser.create_context(url=url, proxy_server=proxy)
+        # Intercept before loading url, so its first requests are filtered too
+        tab = await self.browser.create_context(url="about:blank", proxy_server=proxy)
+        await self._enable_blocking(tab)
+        if url != "about:blank":
+            await tab.send(cdp_page.navigate(url))
+            await tab
+        return tab
+
+    async def close_context(self, context_id: cdp_browser.BrowserContextID) -> None:
+        """Dispose a browser context and close all of its tabs."""
+        if self._context_id == context_id:
+            self.tab, self._context_id = None, None
+        try:
+            await self.browser.connection.send(cdp_target.dispose_browser_context(context_id))
+        except Exception:
+            pass
+
     async def select(self, selector: str, timeout: int = 10) -> Any:
         """Select an element by CSS selector with retry."""
 
@@ -148,7 +254,7 @@ class Browser:
 
     async def type_text(self, element, text: str, speed: str = "normal") -> None:
         """Type text with human-like delays."""
-        await human_type(element, text, TypingConfig(speed=speed), self.config.speed)
+        await human_type(element, text, TypingConfig(speed=speed), self.config.speed, self._rng)
 
     async def delay(self, mode: str = "action") -> None:
         """Wait for a random duration based on delay mode."""
@@ -162,12 +268,63 @@ class Browser:
                 pass
 
     async def block_resources(self, patterns: list[str] | None = None) -> None:
-        """Block resource loading via CDP to save bandwidth."""
-        if not self.tab:
+        """Block resource loading via CDP to save bandwidth.
+
+        Requests are intercepted with the Fetch domain and checked in-process, so blocked requests fail
+        before they are sent. Custom patterns are compiled into a single regex. CDP's URL blocklist is
+        the fallback when Fetch interception is unavailable. Tabs opened later by navigate() or
+        new_context() are filtered the same way.
+        """
+        if patterns is None:
+            self._should_block = should_block
+        else:
+            blocklist = _compile_blocklist(patterns)
+            self._should_block = lambda url: _blocklist_matches(blocklist, url)
+        self._blocked_patterns = patterns
+        self._blocking = True
+        if self.tab:
+            await self._enable_blocking(self.tab)
+
+    async def _enable_blocking(self, tab: uc.Tab) -> None:
+        try:
+            tab.add_handler(cdp_fetch.RequestPaused, self._on_request_paused)
+            await tab.send(
+                cdp_fetch.enable(
+                    patterns=[cdp_fetch.RequestPattern(url_pattern="*", request_stage=cdp_fetch.RequestStage.REQUEST)]
+                )
+            )
             return
+        except Exception:
+            tab.remove_handler(cdp_fetch.RequestPaused, self._on_request_paused)
         try:
-            await self.tab.send(cdp_network.enable())
-            await self.tab.send(cdp_network.set_blocked_ur_ls(urls=patterns or DEFAULT_BLOCKED_PATTERNS))
+            await tab.send(cdp_network.enable())
+            await tab.send(cdp_network.set_blocked_ur_ls(urls=self._blocked_patterns or DEFAULT_BLOCKED_PATTERNS))
+        except Exception:
+            pass
+
+    async def _on_request_paused(self, event: cdp_fetch.RequestPaused, tab: uc.Tab) -> None:
+        try:
+            if self._should_block(event.request.url):
+                await tab.send(cdp_fetch.fail_request(event.request_id, cdp_network.ErrorReason.BLOCKED_BY_CLIENT))
+                return
+        except Exception:
+            pass  # Let the request through rather than leave it paused forever
+        try:
+            await tab.send(cdp_fetch.continue_request(event.request_id))
+        except Exception as e:
+            logger.warning("Could not resume paused request %s: %s", event.request.url, e)
+
+    async def _apply_window_bounds(self) -> None:
+        """Move this tab's window to the configured position and size."""
+        x, y = self.config.window_position
+        w, h = self.config.window_size
+        try:
+            window_id, _ = await self.browser.connection.send(
+                cdp_browser.get_window_for_target(self.tab.target.target_id)
+            )
+            await self.browser.connection.send(
+                cdp_browser.set_window_bounds(window_id, cdp_browser.Bounds(left=x, top=y, width=w, height=h))
+            )
         except Exception:
             pass
 
@@ -180,27 +337,41 @@ class Browser:
         except Exception:
             pass
 
-    async def _move_mouse(self, x: float, y: float) -> None:
-        await self.tab.send(cdp_input.dispatch_mouse_event(type_="mouseMoved", x=x, y=y))
-        if self.config.debug_cursor:
-            try:
-                await self.tab.evaluate(CURSOR_MOVE_JS % (x, y))
-            except Exception:
-                pass
+    async def _animate_debug_cursor(self, path: list[tuple[float, float]], delays: list[float]) -> None:
+        """Replay the path in the page with requestAnimationFrame, in a single evaluate call."""
+        points, elapsed = [], 0.0
+        for (x, y), delay in zip(path, delays):
+            points.append((round(x, 1), round(y, 1), round(elapsed)))
+            elapsed += delay
+        try:
+            await self.tab.evaluate(f"window.__dbgMove({json.dumps(points)})")
+        except Exception:
+            pass
 
     async def _get_element_center(self, element) -> tuple[float, float]:
         box = await element.get_position()
-        return (
-            box.x + box.width / 2 + random.uniform(-box.width * 0.15, box.width * 0.15),
-            box.y + box.height / 2 + random.uniform(-box.height * 0.15, box.height * 0.15),
-        )
+        dx, dy = self._rng.uniform(-0.15, 0.15, size=2) * (box.width, box.height)
+        return box.x + box.width / 2 + float(dx), box.y + box.height / 2 + float(dy)
 
     async def _human_move_to(self, element) -> None:
         await self._inject_debug_cursor()  # Re-inject in case page changed
         target_x, target_y = await self._get_element_center(element)
         path = self.mouse.generate_path(self.cursor_x, self.cursor_y, target_x, target_y)
         delays = self.mouse.calculate_delays(path)
+        # Moves are dispatched without awaiting each CDP response, so round-trips overlap the path timing
+        pending: list[asyncio.Future] = []
+        if self.config.debug_cursor:
+            pending.append(asyncio.ensure_future(self._animate_debug_cursor(path, delays)))
+        owed_ms = 0.0
         for (x, y), delay in zip(path, delays):
-            await self._move_mouse(x, y)
-            await asyncio.sleep(delay / 1000)
+            pending.append(
+                asyncio.ensure_future(self.tab.send(cdp_input.dispatch_mouse_event(type_="mouseMoved", x=x, y=y)))
+            )
+            owed_ms += delay
+            if owed_ms >= MIN_MOVE_SLEEP_MS:
+                await asyncio.sleep(owed_ms / 1000)
+                owed_ms = 0.0
+        if owed_ms:
+            await asyncio.sleep(owed_ms / 1000)
+        await asyncio.gather(*pending)
         self.cursor_x, self.cursor_y = target_x, target_y
@@ -1,4 +1,5 @@
 import asyncio
+import math
 import random
 from dataclasses import dataclass, field
 
@@ -23,14 +24,36 @@ class DelayProfile:
     speed_multiplier: float = 1.0
     extra_delay_probability: float = 0.1
     extra_delay_range: tuple[float, float] = (0.5, 1.5)
+    _extra_log_p: float = field(init=False, repr=False, compare=False)
+    _extra_unit: float = field(init=False, repr=False, compare=False)
+    _scaled: dict[str, tuple[float, float]] = field(init=False, repr=False, compare=False)
+    _scaled_default: tuple[float, float] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        p = self.extra_delay_probability
+        if not 0 <= p < 1:
+            raise ValueError(f"extra_delay_probability must be in [0, 1), got {p}")
+        # log(p) for the geometric draw in random_delay; -inf makes every draw zero
+        object.__setattr__(self, "_extra_log_p", math.log(p) if p > 0 else -math.inf)
+        # Ranges are pre-divided by speed_multiplier so random_delay doesn't rescale on every call
+        speed = self.speed_multiplier
+        object.__setattr__(self, "_extra_unit", sum(self.extra_delay_range) / 2 / speed)
+        object.__setattr__(self, "_scaled", {k: (lo / speed, hi / speed) for k, (lo, hi) in self.delays.items()})
+        object.__setattr__(self, "_scaled_default", (DELAYS["action"][0] / speed, DELAYS["action"][1] / speed))
+
+
+# Shared by callers that pass no profile, so its precomputed ranges aren't rebuilt on every delay
+_DEFAULT_PROFILE = DelayProfile()
 
 
 async def random_delay(mode: str = "action", profile: DelayProfile | None = None) -> None:
     """Wait for a random duration based on delay mode."""
-    p = profile or DelayProfile()
-    min_d, max_d = p.delays.get(mode, DELAYS["action"])
+    p = profile or _DEFAULT_PROFILE
+    lo, hi = p._scaled.get(mode, p._scaled_default)
+    delay = random.uniform(lo, hi)
 
-    if mode != "micro" and random.random() < p.extra_delay_probability:
-        max_d += random.uniform(*p.extra_delay_range)
+    if mode != "micro":
+        # Geometric count of extra pauses: k or more with probability p**k, so mostly none with a long tail
+        delay += math.floor(math.log1p(-random.random()) / p._extra_log_p) * p._extra_unit
 
-    await asyncio.sleep(random.uniform(min_d, max_d) / p.speed_multiplier)
+    await asyncio.sleep(delay)
@@ -1,11 +1,55 @@
 import asyncio
 import email
-import html
+import functools
 import imaplib
+import logging
+import math
 import random
 import re
+import socket
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from email.header import decode_header
+from email.header import decode_header, make_header
+from email.utils import getaddresses
+from html import unescape
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+GMAIL_MAILBOX = '"[Gmail]/All Mail"'
+
+_UID_RE = re.compile(rb"UID (\d+)")
+_HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
+_HREF_BYTES_RE = re.compile(rb'href=["\']([^"\']+)["\']', re.IGNORECASE)
+
+# FETCH items; PEEK keeps messages unread so the UNSEEN search still sees them
+_SUBJECT_ITEMS = "(BODY.PEEK[HEADER.FIELDS (SUBJECT)])"
+_BODY_ITEMS = "(BODY.PEEK[])"
+
+# Characters the link and href regexes rely on, for checking a charset encodes them as plain ASCII
+_ASCII_PROBE = "AZaz09 \"'<>=:/.?&;%-_"
+
+
+@functools.lru_cache(maxsize=None)
+def _is_ascii_compatible(charset: str) -> bool:
+    try:
+        return _ASCII_PROBE.encode(charset) == _ASCII_PROBE.encode("ascii")
+    except (LookupError, UnicodeError):
+        return False
+
+
+# Lowercased (To, From) addresses of one message
+_Addresses = tuple[frozenset[str], frozenset[str]]
+
+# Parsed results kept per client, keyed by (UID, pattern)
+_CACHE_SIZE = 256
+
+# Gmail ends an IDLE session after 30 minutes, so re-issue it a little before that
+_IDLE_REFRESH = 29 * 60
 
 
 @dataclass(frozen=True)
@@ -13,13 +57,84 @@ class GmailConfig:
     email: str
     app_password: str
     max_connections: int = 3
+    # Concurrent IDLE connections, each holding a thread; the link watcher keeps one for itself
+    max_idle_sessions: int = 4
     imap_timeout: int = 15
 
 
+@dataclass(eq=False)
+class _LinkWaiter:
+    target_email: str
+    pattern: re.Pattern
+    sender_filter: str | None
+    existing: set[str]
+    future: asyncio.Future[str]
+
+
 class GmailClient:
     def __init__(self, config: GmailConfig):
         self.config = config
-        self._semaphore = asyncio.Semaphore(config.max_connections)
+        self._mail: imaplib.IMAP4_SSL | None = None
+        self._mail_lock = asyncio.Lock()
+        # Start the SINCE window a day early so server-side timezone differences can't hide new mail
+        self._since = time.strftime("%d-%b-%Y", time.gmtime(time.time() - 86400))
+        # Keyed by the compiled pattern, whose equality covers its flags as well as its source
+        self._code_cache: OrderedDict[tuple[bytes, re.Pattern], str | None] = OrderedDict()
+        self._link_cache: OrderedDict[tuple[bytes, re.Pattern], str | None] = OrderedDict()
+        # Addresses per UID, for routing fetched mail to subscribers
+        self._address_cache: OrderedDict[bytes, _Addresses] = OrderedDict()
+        self._link_waiters: set[_LinkWaiter] = set()
+        # Set by IDLE on new mail and by subscribe(), so the watcher dispatches without waiting
+        self._link_wake = asyncio.Event()
+        self._watch_task: asyncio.Task | None = None
+        # Blocking IMAP calls run on their own pool, sized to the connection budget, not the default executor
+        self._executor = ThreadPoolExecutor(max_workers=config.max_connections, thread_name_prefix="gmail")
+        self._parse_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gmail-parse")
+        # IDLE blocks a thread for the whole wait, so it gets its own pool, capped with the session count
+        self._idle_slots = asyncio.Semaphore(config.max_idle_sessions)
+        self._idle_pool = ThreadPoolExecutor(max_workers=config.max_idle_sessions, thread_name_prefix="gmail-idle")
+
+    async def close(self) -> None:
+        """Log out of the shared IMAP connection and stop the parse workers."""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            # Let the watcher shut its IDLE connection down before the executors go away
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+        for waiter in list(self._link_waiters):
+            if not waiter.future.done():
+                waiter.future.set_exception(RuntimeError("GmailClient closed"))
+        async with self._mail_lock:
+            mail, self._mail = self._mail, None
+            if mail is not None:
+                try:
+                    await self._run_imap(mail.logout)
+                except (imaplib.IMAP4.error, OSError):
+                    pass
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._idle_pool.shutdown(wait=False, cancel_futures=True)
+            self._code_cache.clear()
+            self._link_cache.clear()
+            self._address_cache.clear()
+
+    async def connect(self) -> None:
+        """Open and log in the shared IMAP connection now, rather than on first use."""
+        async with self._mail_lock:
+            await self._run_imap(self._get_mail)
+
+    async def _run_imap(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def _run_locked(self, fn: Callable[..., list[T]], *args, timeout: int = 30) -> list[T]:
+        """Run fn on the shared connection, returning [] if it takes longer than timeout."""
+        # imaplib is not reentrant, so the shared connection is used by one thread at a time
+        async with self._mail_lock:
+            try:
+                return await asyncio.wait_for(self._run_imap(fn, *args), timeout=timeout)
+            except asyncio.TimeoutError:
+                # The worker thread may still be mid-command; don't hand its socket to the next caller
+                self._drop_mail()
+                return []
 
     async def _jittered_sleep(self, base_interval: int) -> float:
         """Sleep with jitter to prevent thundering herd in concurrent scenarios."""
@@ -31,50 +146,199 @@ class GmailClient:
     def _connect(self) -> imaplib.IMAP4_SSL:
         mail = imaplib.IMAP4_SSL("imap.gmail.com", timeout=self.config.imap_timeout)
         mail.login(self.config.email, self.config.app_password)
+        mail.select(GMAIL_MAILBOX)
         return mail
 
+    def _get_mail(self) -> imaplib.IMAP4_SSL:
+        """Return the shared IMAP connection, reconnecting if the server dropped it."""
+        if self._mail is not None:
+            try:
+                self._mail.noop()
+                return self._mail
+            except (imaplib.IMAP4.abort, OSError):
+                self._mail = None
+        self._mail = self._connect()
+        return self._mail
+
+    def _drop_mail(self) -> None:
+        """Discard the shared connection without waiting on the server."""
+        mail, self._mail = self._mail, None
+        if mail is not None:
+            try:
+                mail.shutdown()
+            except OSError:
+                pass
+
+    def _idle(self, mail: imaplib.IMAP4_SSL, notify: Callable[[], None]) -> None:
+        """Hold mail in IMAP IDLE, calling notify once IDLE is active and on every new message.
+
+        imaplib has no IDLE support, so the command is sent raw. This blocks until the
+        socket is shut down from another thread.
+        """
+        if "IDLE" not in mail.capabilities:
+            raise imaplib.IMAP4.error("server does not support IDLE")
+        tag = mail._new_tag()
+        mail.send(tag + b" IDLE\r\n")
+        while not (line := mail.readline()).startswith(b"+"):
+            if not line or line.startswith(tag):
+                raise imaplib.IMAP4.error(f"IDLE rejected: {line!r}")
+        # A quiet mailbox sends nothing for minutes, so imap_timeout would end IDLE early.
+        # Reads block until new mail or until _idle_poll shuts the socket down.
+        mail.sock.settimeout(None)
+        notify()
+        while line := mail.readline():
+            if line.rstrip().endswith(b"EXISTS"):
+                notify()
+        raise imaplib.IMAP4.abort("connection closed during IDLE")
+
     def _extract_code_from_subject(self, subject: str, pattern: re.Pattern) -> str | None:
         match = pattern.search(subject)
         return match.group(1) if match else None
 
     def _decode_subject(self, msg: email.message.Message) -> str:
         decoded_parts = decode_header(msg.get("Subject", ""))
-        return "".join(
-            part.decode(enc or "utf-8", errors="ignore") if isinstance(part, bytes) else part
-            for part, enc in decoded_parts
-        )
+        try:
+            return str(make_header(decoded_parts))
+        except (LookupError, UnicodeDecodeError):
+            pass  # Unknown charset or bad bytes; decode leniently part by part
+        return "".join(self._decode_header_part(part, enc) for part, enc in decoded_parts)
 
-    def _get_email_body(self, msg: email.message.Message) -> str:
-        """Extract and decode email body content."""
-        body = ""
+    def _decode_header_part(self, part: bytes | str, charset: str | None) -> str:
+        if isinstance(part, str):
+            return part
+        try:
+            return part.decode(charset or "utf-8", errors="replace")
+        except LookupError:
+            return part.decode("utf-8", errors="replace")
+
+    def _iter_payloads(self, msg: email.message.Message) -> Iterator[tuple[bytes, str]]:
+        """Yield (payload, charset) for each non-empty text part of the email, HTML parts first."""
         if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                if content_type in ("text/plain", "text/html"):
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        charset = part.get_content_charset() or "utf-8"
-                        body += payload.decode(charset, errors="ignore")
+            parts = [part for part in msg.walk() if part.get_content_type() in ("text/plain", "text/html")]
+            # Links live in the HTML part, so it is the one most likely to end the scan early
+            parts.sort(key=lambda part: part.get_content_type() != "text/html")
         else:
-            payload = msg.get_payload(decode=True)
+            parts = [msg]
+        for part in parts:
+            payload = part.get_payload(decode=True)
             if payload:
-                charset = msg.get_content_charset() or "utf-8"
-                body = payload.decode(charset, errors="ignore")
-        # Unescape HTML entities (e.g., &amp; -> &)
-        body = html.unescape(body)
-        return body
-
-    def _extract_link_from_body(self, body: str, pattern: re.Pattern) -> str | None:
-        """Extract a link from email body using pattern."""
+                yield payload, part.get_content_charset() or "utf-8"
+
+    def _iter_decoded_parts(self, msg: email.message.Message) -> Iterator[str]:
+        """Yield each decoded text part of the email, HTML parts first."""
+        for payload, charset in self._iter_payloads(msg):
+            yield payload.decode(charset, errors="ignore")
+
+    def _iter_ascii_payloads(self, msg: email.message.Message) -> Iterator[bytes]:
+        """Yield each text payload as ASCII-compatible bytes, transcoding only parts that aren't (e.g. UTF-16)."""
+        for payload, charset in self._iter_payloads(msg):
+            if _is_ascii_compatible(charset):
+                yield payload
+                continue
+            try:
+                yield payload.decode(charset, errors="ignore").encode("utf-8")
+            except LookupError:
+                yield payload  # Unknown charset: scanning the raw bytes is the best guess
+
+    def _extract_link_from_bytes(self, msg: email.message.Message, pattern: re.Pattern[bytes]) -> str | None:
+        """Like _extract_link_from_body, but scans the raw payloads so ASCII URLs skip the decoder."""
+        for payload in self._iter_ascii_payloads(msg):
+            for href_match in _HREF_BYTES_RE.finditer(payload):
+                if pattern.search(href_match.group(1)):
+                    return unescape(href_match.group(1).decode("ascii", errors="ignore"))
+        for payload in self._iter_ascii_payloads(msg):
+            match = pattern.search(payload)
+            if match:
+                return unescape(match.group(0).decode("ascii", errors="ignore"))
+        return None
+
+    def _extract_link_from_body(self, msg: email.message.Message, pattern: re.Pattern) -> str | None:
+        """Extract a link from email body using pattern, stopping at the first matching part."""
+        if isinstance(pattern.pattern, bytes):
+            return self._extract_link_from_bytes(msg, pattern)
         # First try to extract href values from HTML anchor tags
-        href_pattern = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
-        for href_match in href_pattern.finditer(body):
-            href = href_match.group(1)
-            if pattern.search(href):
-                return href
+        for text in self._iter_decoded_parts(msg):
+            for href_match in _HREF_RE.finditer(text):
+                # Unescape HTML entities (e.g., &amp; -> &)
+                href = unescape(href_match.group(1))
+                if pattern.search(href):
+                    return href
         # Fallback to direct pattern search in body
-        match = pattern.search(body)
-        return match.group(0) if match else None
+        for text in self._iter_decoded_parts(msg):
+            match = pattern.search(unescape(text))
+            if match:
+                return match.group(0)
+        return None
+
+    def _parse_code(self, raw: bytes, pattern: re.Pattern) -> str | None:
+        return self._extract_code_from_subject(self._decode_subject(email.message_from_bytes(raw)), pattern)
+
+    def _parse_link(self, raw: bytes, pattern: re.Pattern) -> str | None:
+        return self._extract_link_from_body(email.message_from_bytes(raw), pattern)
+
+    def _parse_envelope(self, raw: bytes, patterns: list[re.Pattern]) -> tuple[_Addresses, list[str | None]]:
+        msg = email.message_from_bytes(raw)
+        addresses = (
+            frozenset(addr.lower() for _, addr in getaddresses(msg.get_all("To", []))),
+            frozenset(addr.lower() for _, addr in getaddresses(msg.get_all("From", []))),
+        )
+        return addresses, [self._extract_link_from_body(msg, pattern) for pattern in patterns]
+
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key, value) -> None:
+        cache[key] = value
+        if len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _search_uids(
+        self,
+        mail: imaplib.IMAP4_SSL,
+        target_email: str,
+        sender_filter: str | None,
+        limit: int,
+    ) -> list[bytes]:
+        """Return the UIDs of the newest unread messages to target_email since the session started."""
+        search_query = f'TO "{target_email}" SINCE {self._since} UNSEEN'
+        if sender_filter:
+            search_query = f'FROM "{sender_filter}" {search_query}'
+        _, data = mail.uid("SEARCH", None, f"({search_query})")
+        return data[0].split()[-limit:] if data[0] else []
+
+    def _fetch_raw(self, mail: imaplib.IMAP4_SSL, uids: list[bytes], message_parts: str) -> list[tuple[bytes, bytes]]:
+        """Fetch message_parts for every UID in one round-trip, returning (uid, data) pairs."""
+        _, msg_data = mail.uid("FETCH", b",".join(uids), message_parts)
+        return [
+            (uid_match.group(1), response_part[1])
+            for response_part in msg_data
+            if isinstance(response_part, tuple) and (uid_match := _UID_RE.search(response_part[0]))
+        ]
+
+    def _fetch_matches(
+        self,
+        mail: imaplib.IMAP4_SSL,
+        uids: list[bytes],
+        message_parts: str,
+        pattern: re.Pattern,
+        parse: Callable[[bytes, re.Pattern], str | None],
+        cache: OrderedDict[tuple[bytes, re.Pattern], str | None],
+    ) -> list[str]:
+        """Return the distinct parse results for uids, newest first, fetching only uncached UIDs."""
+        # UIDs are stable, so a message parsed on an earlier poll never needs fetching or scanning again
+        missing = [uid for uid in uids if (uid, pattern) not in cache]
+        if missing:
+            fetched = self._fetch_raw(mail, missing, message_parts)
+            parsed = self._parse_pool.map(functools.partial(parse, pattern=pattern), [raw for _, raw in fetched])
+            for (uid, _), result in zip(fetched, parsed):
+                self._cache_put(cache, (uid, pattern), result)
+        results: list[str] = []
+        for uid in reversed(uids):
+            key = (uid, pattern)
+            if key in cache:
+                cache.move_to_end(key)
+                result = cache[key]
+                if result and result not in results:
+                    results.append(result)
+        return results
 
     def _get_all_links(
         self,
@@ -84,29 +348,9 @@ class GmailClient:
         limit: int = 10,
     ) -> list[str]:
         """Get all links matching pattern from email bodies."""
-        mail = self._connect()
-        links: list[str] = []
-        try:
-            mail.select('"[Gmail]/All Mail"')
-            search_query = f'TO "{target_email}"'
-            if sender_filter:
-                search_query = f'(FROM "{sender_filter}" {search_query})'
-            _, message_numbers = mail.search(None, search_query)
-            if not message_numbers[0]:
-                return links
-            all_nums = message_numbers[0].split()
-            for num in reversed(all_nums[-limit:] if len(all_nums) > limit else all_nums):
-                _, msg_data = mail.fetch(num, "(RFC822)")
-                for response_part in msg_data:
-                    if isinstance(response_part, tuple):
-                        msg = email.message_from_bytes(response_part[1])
-                        body = self._get_email_body(msg)
-                        link = self._extract_link_from_body(body, pattern)
-                        if link and link not in links:
-                            links.append(link)
-            return links
-        finally:
-            mail.logout()
+        mail = self._get_mail()
+        uids = self._search_uids(mail, target_email, sender_filter, limit)
+        return self._fetch_matches(mail, uids, _BODY_ITEMS, pattern, self._parse_link, self._link_cache)
 
     def _get_all_codes(
         self,
@@ -115,28 +359,138 @@ class GmailClient:
         sender_filter: str | None = None,
         limit: int = 10,
     ) -> list[str]:
-        mail = self._connect()
-        codes: list[str] = []
-        try:
-            mail.select('"[Gmail]/All Mail"')
-            search_query = f'TO "{target_email}"'
-            if sender_filter:
-                search_query = f'(FROM "{sender_filter}" {search_query})'
-            _, message_numbers = mail.search(None, search_query)
-            if not message_numbers[0]:
-                return codes
-            all_nums = message_numbers[0].split()
-            for num in reversed(all_nums[-limit:] if len(all_nums) > limit else all_nums):
-                _, msg_data = mail.fetch(num, "(RFC822)")
-                for response_part in msg_data:
-                    if isinstance(response_part, tuple):
-                        msg = email.message_from_bytes(response_part[1])
-                        code = self._extract_code_from_subject(self._decode_subject(msg), pattern)
-                        if code and code not in codes:
-                            codes.append(code)
-            return codes
-        finally:
-            mail.logout()
+        mail = self._get_mail()
+        uids = self._search_uids(mail, target_email, sender_filter, limit)
+        # Only the Subject header is needed, so don't stream the body
+        return self._fetch_matches(mail, uids, _SUBJECT_ITEMS, pattern, self._parse_code, self._code_cache)
+
+    def _get_envelopes(
+        self,
+        target_emails: list[str],
+        patterns: list[re.Pattern],
+        sender_filter: str | None,
+        limit: int,
+    ) -> list[tuple[_Addresses, dict[re.Pattern, str | None]]]:
+        """Search once for unread mail to any of target_emails and return (To, From) and links per pattern.
+
+        Results are newest first. Bodies are only fetched for UIDs not already parsed for every pattern.
+        """
+        mail = self._get_mail()
+        # IMAP OR is binary, so n addresses nest as OR TO a OR TO b TO c
+        search_query = f'TO "{target_emails[-1]}"'
+        for target_email in reversed(target_emails[:-1]):
+            search_query = f'OR TO "{target_email}" {search_query}'
+        search_query = f"{search_query} SINCE {self._since} UNSEEN"
+        if sender_filter:
+            search_query = f'FROM "{sender_filter}" {search_query}'
+        _, data = mail.uid("SEARCH", None, f"({search_query})")
+        uids = data[0].split()[-limit:] if data[0] else []
+
+        missing = [
+            uid
+            for uid in uids
+            if uid not in self._address_cache or any((uid, p) not in self._link_cache for p in patterns)
+        ]
+        if missing:
+            fetched = self._fetch_raw(mail, missing, _BODY_ITEMS)
+            parsed = self._parse_pool.map(
+                functools.partial(self._parse_envelope, patterns=patterns), [raw for _, raw in fetched]
+            )
+            for (uid, _), (addresses, links) in zip(fetched, parsed):
+                self._cache_put(self._address_cache, uid, addresses)
+                for pattern, link in zip(patterns, links):
+                    self._cache_put(self._link_cache, (uid, pattern), link)
+        return [
+            (self._address_cache[uid], {p: self._link_cache.get((uid, p)) for p in patterns})
+            for uid in reversed(uids)
+            if uid in self._address_cache
+        ]
+
+    async def _idle_poll(
+        self,
+        timeout: float,
+        poll: Callable[[], Awaitable[str | None]],
+        wake: asyncio.Event | None = None,
+    ) -> str | None:
+        """Run poll whenever IDLE reports new mail, until it returns a result or timeout elapses.
+
+        Pass wake to also let other code trigger a poll by setting it. Holds one of the
+        max_idle_sessions slots throughout, waiting for one if all are taken.
+        """
+        async with self._idle_slots:
+            return await self._idle_session(timeout, poll, wake)
+
+    async def _idle_session(
+        self,
+        timeout: float,
+        poll: Callable[[], Awaitable[str | None]],
+        wake: asyncio.Event | None,
+    ) -> str | None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            # IDLE occupies its connection, so it gets its own rather than blocking the shared one
+            mail = await loop.run_in_executor(self._idle_pool, self._connect)
+            wake = wake or asyncio.Event()
+            idle_task = loop.run_in_executor(
+                self._idle_pool, self._idle, mail, lambda: loop.call_soon_threadsafe(wake.set)
+            )
+            refresh_at = min(deadline, loop.time() + _IDLE_REFRESH)
+            try:
+                while (remaining := refresh_at - loop.time()) > 0:
+                    wake_task = asyncio.ensure_future(wake.wait())
+                    done, _ = await asyncio.wait(
+                        {wake_task, idle_task}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    wake_task.cancel()
+                    if idle_task in done:
+                        idle_task.result()  # _idle only ever returns by raising
+                    if not done:
+                        break
+                    wake.clear()
+                    if (result := await poll()) is not None:
+                        return result
+            finally:
+                # Shutting the socket down unblocks the readline in the IDLE thread
+                try:
+                    mail.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                await asyncio.gather(idle_task, return_exceptions=True)
+                try:
+                    mail.shutdown()
+                except OSError:
+                    pass
+        return None
+
+    async def _wait_for_new(
+        self,
+        fetch: Callable[[], Awaitable[list[str]]],
+        existing: set[str],
+        timeout: int,
+        poll_interval: int,
+    ) -> str | None:
+        """Return the first fetched item not in existing, or None once timeout elapses."""
+
+        async def poll() -> str | None:
+            for item in await fetch():
+                if item not in existing:
+                    return item
+            return None
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        # With every IDLE slot taken, poll rather than queue behind waits that may run their full timeout
+        if not self._idle_slots.locked():
+            try:
+                return await self._idle_poll(timeout, poll)
+            except (imaplib.IMAP4.error, OSError):
+                pass  # Fall back to polling for whatever time is left
+        while loop.time() < deadline:
+            await self._jittered_sleep(poll_interval)
+            if (item := await poll()) is not None:
+                return item
+        return None
 
     async def _fetch_codes(
         self,
@@ -146,14 +500,7 @@ class GmailClient:
         limit: int = 10,
         timeout: int = 30,
     ) -> list[str]:
-        async with self._semaphore:
-            try:
-                return await asyncio.wait_for(
-                    asyncio.to_thread(self._get_all_codes, target_email, pattern, sender_filter, limit),
-                    timeout=timeout,
-                )
-            except asyncio.TimeoutError:
-                return []
+        return await self._run_locked(self._get_all_codes, target_email, pattern, sender_filter, limit, timeout=timeout)
 
     async def get_existing_codes(
         self,
@@ -175,12 +522,14 @@ class GmailClient:
         """Wait for a new verification code, raises TimeoutError if not found."""
         if existing_codes is None:
             existing_codes = await self.get_existing_codes(target_email, pattern, sender_filter)
-        elapsed = 0.0
-        while elapsed < timeout:
-            elapsed += await self._jittered_sleep(poll_interval)
-            for code in await self._fetch_codes(target_email, pattern, sender_filter, 5):
-                if code not in existing_codes:
-                    return code
+        code = await self._wait_for_new(
+            lambda: self._fetch_codes(target_email, pattern, sender_filter, 5),
+            existing_codes,
+            timeout,
+            poll_interval,
+        )
+        if code is not None:
+            return code
         raise TimeoutError(f"No verification code received for {target_email} within {timeout}s")
 
     async def wait_for_code_optional(
@@ -195,13 +544,12 @@ class GmailClient:
         """Wait for a new verification code, returns None if not found."""
         if existing_codes is None:
             existing_codes = await self.get_existing_codes(target_email, pattern, sender_filter)
-        elapsed = 0.0
-        while elapsed < timeout:
-            elapsed += await self._jittered_sleep(poll_interval)
-            for code in await self._fetch_codes(target_email, pattern, sender_filter, 5):
-                if code not in existing_codes:
-                    return code
-        return None
+        return await self._wait_for_new(
+            lambda: self._fetch_codes(target_email, pattern, sender_filter, 5),
+            existing_codes,
+            timeout,
+            poll_interval,
+        )
 
     async def _fetch_links(
         self,
@@ -211,14 +559,101 @@ class GmailClient:
         limit: int = 10,
         timeout: int = 30,
     ) -> list[str]:
-        async with self._semaphore:
+        return await self._run_locked(self._get_all_links, target_email, pattern, sender_filter, limit, timeout=timeout)
+
+    async def _fetch_envelopes(
+        self,
+        target_emails: list[str],
+        patterns: list[re.Pattern],
+        sender_filter: str | None,
+        limit: int,
+        timeout: int = 30,
+    ) -> list[tuple[_Addresses, dict[re.Pattern, str | None]]]:
+        return await self._run_locked(
+            self._get_envelopes, target_emails, patterns, sender_filter, limit, timeout=timeout
+        )
+
+    async def _dispatch_links(self) -> None:
+        """Run one search for every subscriber and resolve those whose link has arrived."""
+        waiters = [waiter for waiter in self._link_waiters if not waiter.future.done()]
+        if not waiters:
+            return
+        target_emails = sorted({waiter.target_email for waiter in waiters})
+        patterns = list({waiter.pattern for waiter in waiters})
+        senders = {waiter.sender_filter for waiter in waiters}
+        # The sender can only narrow the search when every subscriber filters on the same one
+        sender_filter = senders.pop() if len(senders) == 1 else None
+        envelopes = await self._fetch_envelopes(target_emails, patterns, sender_filter, 5 * len(target_emails))
+        for (to_addrs, from_addrs), links in envelopes:
+            for waiter in waiters:
+                # Exact address match: a substring test would hand ann1@x.com the mail for joann1@x.com
+                if waiter.future.done() or waiter.target_email.lower() not in to_addrs:
+                    continue
+                # The sender filter keeps IMAP FROM's substring semantics, checked per address
+                sender = waiter.sender_filter and waiter.sender_filter.lower()
+                if sender and not any(sender in addr for addr in from_addrs):
+                    continue
+                link = links.get(waiter.pattern)
+                if link and link not in waiter.existing:
+                    waiter.future.set_result(link)
+
+    async def _watch_links(self, poll_interval: int) -> None:
+        """Dispatch new mail to subscribers until close(), woken by IDLE where the server supports it."""
+
+        async def dispatch() -> None:
+            # One bad search or message must not end the watch for every subscriber
             try:
-                return await asyncio.wait_for(
-                    asyncio.to_thread(self._get_all_links, target_email, pattern, sender_filter, limit),
-                    timeout=timeout,
-                )
-            except asyncio.TimeoutError:
-                return []
+                await self._dispatch_links()
+            except (imaplib.IMAP4.error, OSError):
+                self._drop_mail()  # Reconnect on the next dispatch
+            except Exception:
+                logger.exception("Link dispatch failed; retrying on the next wake")
+
+        loop = asyncio.get_running_loop()
+        use_idle = True
+        # Runs until close() cancels it, which also fails any waiters still pending
+        while True:
+            if use_idle:
+                started = loop.time()
+                try:
+                    # dispatch never returns a result, so this only ends by raising
+                    await self._idle_poll(math.inf, dispatch, self._link_wake)
+                except TimeoutError:
+                    continue  # A slow read or login, not a lost connection; re-enter IDLE
+                except (imaplib.IMAP4.abort, OSError):
+                    if loop.time() - started > poll_interval:
+                        continue  # A long-lived session dropped; reconnect now, IDLE dispatches on entry
+                    # Failing fast: poll once and back off before the next attempt
+                except imaplib.IMAP4.error:
+                    use_idle = False  # No IDLE on this server; poll from here on
+                except Exception:
+                    logger.exception("IDLE session failed; polling before the next attempt")
+            await self._jittered_sleep(poll_interval)
+            await dispatch()
+
+    def subscribe(
+        self,
+        target_email: str,
+        pattern: re.Pattern,
+        sender_filter: str | None = None,
+        existing_links: set[str] | None = None,
+        poll_interval: int = 5,
+    ) -> asyncio.Future[str]:
+        """Return a future resolved with the first new link mailed to target_email.
+
+        All subscribers share one background watcher, which holds the mailbox in IMAP IDLE
+        (polling every poll_interval if IDLE is unavailable) until close(). Cancel the future
+        (e.g. via asyncio.wait_for) to unsubscribe.
+        """
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        waiter = _LinkWaiter(target_email, pattern, sender_filter, existing_links or set(), future)
+        self._link_waiters.add(waiter)
+        future.add_done_callback(lambda _: self._link_waiters.discard(waiter))
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_links(poll_interval))
+        else:
+            self._link_wake.set()  # The mail may already be here
+        return future
 
     async def get_existing_links(
         self,
@@ -240,10 +675,10 @@ class GmailClient:
         """Wait for a new verification link from email body, returns None if not found."""
         if existing_links is None:
             existing_links = await self.get_existing_links(target_email, pattern, sender_filter)
-        elapsed = 0.0
-        while elapsed < timeout:
-            elapsed += await self._jittered_sleep(poll_interval)
-            for link in await self._fetch_links(target_email, pattern, sender_filter, 5):
-                if link not in existing_links:
-                    return link
-        return None
+        try:
+            return await asyncio.wait_for(
+                self.subscribe(target_email, pattern, sender_filter, existing_links, poll_interval),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            return None
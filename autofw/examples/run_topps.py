@@ -11,26 +11,29 @@ from autofw import BrowserConfig, GmailConfig
 from autofw.email import GmailClient
 from autofw.examples.topps import ToppsAccountGenerator
 
+# Building a Faker loads its locale providers, so do it once per process
+_FAKER = Faker()
+
 
 def generate_password(length: int = 16) -> str:
     """Generate a secure random password."""
     alphabet = string.ascii_letters + string.digits + "!@#$%"
-    while True:
-        password = "".join(secrets.choice(alphabet) for _ in range(length))
-        if (
-            any(c.islower() for c in password)
-            and any(c.isupper() for c in password)
-            and any(c.isdigit() for c in password)
-            and any(c in "!@#$%" for c in password)
-        ):
-            return password
+    # One character from each required class, then fill and shuffle: a single pass, no rejection loop
+    chars = [
+        secrets.choice(string.ascii_lowercase),
+        secrets.choice(string.ascii_uppercase),
+        secrets.choice(string.digits),
+        secrets.choice("!@#$%"),
+    ]
+    chars.extend(secrets.choice(alphabet) for _ in range(length - len(chars)))
+    secrets.SystemRandom().shuffle(chars)
+    return "".join(chars)
 
 
 def generate_account_data(catchall_domain: str) -> dict:
     """Generate random account data."""
-    fake = Faker()
-    first_name = fake.first_name()
-    last_name = fake.last_name()
+    first_name = _FAKER.first_name()
+    last_name = _FAKER.last_name()
     suffix = random.randint(1000, 9999)
     username = f"{first_name}{last_name}{suffix}"
 
@@ -96,6 +99,7 @@ async def main():
 
     finally:
         await generator.stop()
+        await email_client.close()
 
 
 if __name__ == "__main__":
@@ -1,19 +1,21 @@
 import asyncio
+import atexit
 import csv
 import os
-import random
-import secrets
-import string
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, TextIO
 
 from dotenv import load_dotenv
-from faker import Faker
 
-from autofw import BrowserConfig, GmailConfig
+from autofw import BrowserConfig, BrowserPool, GmailConfig
 from autofw.email import GmailClient
+from autofw.examples.run_topps import generate_account_data
 from autofw.examples.topps import ToppsAccountGenerator
 
+# Open CSV files and their writers, kept for the life of the process
+_CSV_WRITERS: dict[str, tuple[TextIO, Any]] = {}
+
 
 @dataclass
 class AccountResult:
@@ -23,53 +25,24 @@ class AccountResult:
     message: str
 
 
-def generate_password(length: int = 16) -> str:
-    """Generate a secure random password."""
-    alphabet = string.ascii_letters + string.digits + "!@#$%"
-    while True:
-        password = "".join(secrets.choice(alphabet) for _ in range(length))
-        if (
-            any(c.islower() for c in password)
-            and any(c.isupper() for c in password)
-            and any(c.isdigit() for c in password)
-            and any(c in "!@#$%" for c in password)
-        ):
-            return password
-
-
-def generate_account_data(catchall_domain: str) -> dict:
-    """Generate random account data."""
-    fake = Faker()
-    first_name = fake.first_name()
-    last_name = fake.last_name()
-    suffix = random.randint(1000, 9999)
-    username = f"{first_name}{last_name}{suffix}"
-
-    return {
-        "email": f"{username}@{catchall_domain}",
-        "first_name": first_name,
-        "last_name": last_name,
-        "password": generate_password(),
-    }
+def _csv_writer(filename: str) -> tuple[TextIO, Any]:
+    """Return the process-wide append writer for filename, opening it on first use."""
+    if filename not in _CSV_WRITERS:
+        f = open(filename, "a", newline="", buffering=1 << 16)
+        atexit.register(f.close)
+        writer = csv.writer(f)
+        if f.tell() == 0:
+            writer.writerow(["timestamp", "email", "password", "status"])
+        _CSV_WRITERS[filename] = (f, writer)
+    return _CSV_WRITERS[filename]
 
 
 def save_results_to_csv(results: list[AccountResult], filename: str = "accounts.csv"):
     """Append successful accounts to CSV file."""
-    file_exists = os.path.exists(filename)
-    with open(filename, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["timestamp", "email", "password", "status"])
-        for result in results:
-            if result.success:
-                writer.writerow(
-                    [
-                        datetime.now().isoformat(),
-                        result.email,
-                        result.password,
-                        "success",
-                    ]
-                )
+    f, writer = _csv_writer(filename)
+    timestamp = datetime.now().isoformat()
+    writer.writerows([timestamp, r.email, r.password, "success"] for r in results if r.success)
+    f.flush()  # One write for the whole batch
 
 
 class TileManager:
@@ -88,22 +61,17 @@ class TileManager:
         self.rows = max(1, (max_tiles + self.columns - 1) // self.columns)  # Ceiling division
         self.window_width = screen_width // self.columns
         self.window_height = screen_height // self.rows
-        self._available = list(range(max_tiles))
-        self._lock = asyncio.Lock()
+        self._slots: asyncio.Queue[int] = asyncio.Queue(max_tiles)
+        for slot in range(max_tiles):
+            self._slots.put_nowait(slot)
 
     async def acquire(self) -> int:
-        """Get an available tile slot."""
-        async with self._lock:
-            if self._available:
-                return self._available.pop(0)
-            return 0  # Fallback to first position
+        """Wait for an available tile slot."""
+        return await self._slots.get()
 
-    async def release(self, slot: int):
+    def release(self, slot: int):
         """Return a tile slot to the pool."""
-        async with self._lock:
-            if slot not in self._available and slot < self.max_tiles:
-                self._available.append(slot)
-                self._available.sort()
+        self._slots.put_nowait(slot)
 
     def get_position(self, slot: int) -> tuple[tuple[int, int], tuple[int, int]]:
         """Get window position and size for a tile slot."""
@@ -118,11 +86,22 @@ async def create_single_account(
     instance_id: int,
     account_data: dict,
     email_client: GmailClient,
-    semaphore: asyncio.Semaphore,
+    pool: BrowserPool,
     tile_manager: TileManager,
 ) -> AccountResult:
-    """Create a single account with semaphore-controlled concurrency."""
-    async with semaphore:
+    """Create a single account in a browser borrowed from the pool."""
+    try:
+        browser = await pool.acquire()
+    except RuntimeError as e:
+        return AccountResult(
+            email=account_data["email"],
+            password=account_data["password"],
+            success=False,
+            message=str(e),
+        )
+
+    success, message, broken = False, "", False
+    try:
         # Acquire a tile slot for window positioning
         tile_slot = await tile_manager.acquire()
         position, size = tile_manager.get_position(tile_slot)
@@ -136,7 +115,7 @@ async def create_single_account(
         )
         generator = ToppsAccountGenerator(config=config, instance_id=instance_id)
         try:
-            await generator.start()
+            await generator.start(cdp_url=browser.cdp_url)
             success, message = await generator.create_account(
                 email=account_data["email"],
                 first_name=account_data["first_name"],
@@ -144,25 +123,28 @@ async def create_single_account(
                 password=account_data["password"],
                 email_client=email_client,
             )
-            return AccountResult(
-                email=account_data["email"],
-                password=account_data["password"],
-                success=success,
-                message=message,
-            )
-        except Exception as e:
-            return AccountResult(
-                email=account_data["email"],
-                password=account_data["password"],
-                success=False,
-                message=str(e),
-            )
         finally:
             await generator.stop()
-            await tile_manager.release(tile_slot)
+            tile_manager.release(tile_slot)
+    except Exception as e:
+        # create_account reports flow failures by return value, so anything raised here came from
+        # starting, attaching to or stopping the browser; replace it rather than reuse it
+        broken = True
+        message = str(e)
+    finally:
+        await pool.release(browser, failed=broken)
+    return AccountResult(
+        email=account_data["email"],
+        password=account_data["password"],
+        success=success,
+        message=message,
+    )
 
 
 async def main():
+    # Let new tasks run synchronously until their first real await (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
     load_dotenv()
 
     # Required config
@@ -193,9 +175,10 @@ async def main():
             app_password=gmail_app_password,
         )
     )
+    # Log in once up front so bad credentials fail before any browser launches
+    await email_client.connect()
 
-    # Create semaphore for browser concurrency and tile manager for window positions
-    semaphore = asyncio.Semaphore(max_concurrent)
+    # Tile manager for window positions
     tile_manager = TileManager(max_tiles=max_concurrent)
 
     # Generate account data for all accounts
@@ -206,29 +189,48 @@ async def main():
         print(f"  [{i}] {acc['email']}")
     print()
 
-    # Run all account creations concurrently with tiled windows
-    tasks = [create_single_account(i, acc, email_client, semaphore, tile_manager) for i, acc in enumerate(accounts)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Filter valid results
-    valid_results = [r for r in results if isinstance(r, AccountResult)]
+    # Pre-launch the browsers; the pool size bounds concurrency and each worker attaches in its own context
+    pool = BrowserPool(size=max_concurrent, max_uses=50, config=BrowserConfig(headless=False))
+    await pool.start()
+
+    # A fixed set of workers drains the queue, so only max_concurrent account frames are ever live
+    work: asyncio.Queue[tuple[int, dict]] = asyncio.Queue()
+    for item in enumerate(accounts):
+        work.put_nowait(item)
+    results: list[AccountResult] = []
+
+    async def worker():
+        # The queue is filled up front, so an empty queue means the work is done
+        while not work.empty():
+            i, acc = work.get_nowait()
+            # One bad account must never cancel the other workers in the TaskGroup
+            try:
+                result = await create_single_account(i, acc, email_client, pool, tile_manager)
+            except Exception as e:
+                result = AccountResult(email=acc["email"], password=acc["password"], success=False, message=str(e))
+            results.append(result)
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(max_concurrent):
+                tg.create_task(worker())
+    finally:
+        await email_client.close()
+        await pool.close()
 
     # Save successful accounts to CSV
-    save_results_to_csv(valid_results)
+    save_results_to_csv(results)
 
     # Print summary
-    successful = sum(1 for r in valid_results if r.success)
-    failed = len(valid_results) - successful
-    errors = len(results) - len(valid_results)
+    successful = sum(1 for r in results if r.success)
+    failed = len(results) - successful
 
     print()
     print("=" * 50)
-    print(f"RESULTS: {successful} success, {failed} failed, {errors} errors")
+    print(f"RESULTS: {successful} success, {failed} failed")
     print("=" * 50)
     for result in results:
-        if isinstance(result, Exception):
-            print(f"  ERROR: {result}")
-        elif result.success:
+        if result.success:
             print(f"  OK: {result.email}")
         else:
             print(f"  FAIL: {result.email} - {result.message}")
@@ -238,4 +240,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -1,9 +1,11 @@
 import asyncio
 import re
+from dataclasses import replace
 from enum import Enum, auto
 
 from autofw.browser import Browser
 from autofw.email import GmailClient
+from autofw.retry import RetryConfig, retry
 
 
 class ToppsState(Enum):
@@ -24,20 +26,32 @@ class ToppsState(Enum):
     FAILED = auto()
 
 
-# URL patterns for validating each state
-STATE_VALIDATORS = {
-    ToppsState.HOMEPAGE: lambda url: "topps.com" in url,
-    ToppsState.LOGIN_PAGE: lambda url: "id.fanatics.com" in url or "account/login" in url,
-    ToppsState.EMAIL_ENTRY: lambda url: "id.fanatics.com" in url,
-    ToppsState.REGISTRATION_FORM: lambda url: "id.fanatics.com" in url,
-    ToppsState.VERIFICATION_LINK: lambda url: "verify-email" in url,
+# URL substrings for validating each state; any one matching is enough
+STATE_VALIDATORS: dict[ToppsState, tuple[str, ...]] = {
+    ToppsState.HOMEPAGE: ("topps.com",),
+    ToppsState.LOGIN_PAGE: ("id.fanatics.com", "account/login"),
+    ToppsState.EMAIL_ENTRY: ("id.fanatics.com",),
+    ToppsState.REGISTRATION_FORM: ("id.fanatics.com",),
+    ToppsState.VERIFICATION_LINK: ("verify-email",),
 }
 
 
+class _CheckFailed(Exception):
+    """A step ran but its post-condition didn't hold; raised so retry() tries again."""
+
+
+# Backoff between attempts of a flow step; max_retries is set per call
+STEP_RETRY = RetryConfig(max_retries=2, base_delay=0.5, max_delay=4.0)
+
+# Any of these on the page means the Cloudflare challenge hasn't cleared
+CF_CHALLENGE_SELECTOR = "#challenge-running, #challenge-stage, iframe[src*='challenges.cloudflare.com']"
+
+
 class ToppsAccountGenerator(Browser):
     TOPPS_URL = "https://www.topps.com/"
     FANATICS_SENDER = "no-reply@t.one.fan"
-    VERIFY_LINK_PATTERN = re.compile(r"https://[^\s\"'<>]+verify-email[^\s\"'<>]+token=[^\s\"'<>]+")
+    # Bytes + ASCII so email bodies are scanned raw instead of decoded to str first
+    VERIFY_LINK_PATTERN = re.compile(rb"https://[^\s\"'<>]+verify-email[^\s\"'<>]+token=[^\s\"'<>]+", re.ASCII)
 
     def __init__(self, config=None, instance_id: int = 0):
         super().__init__(config)
@@ -50,75 +64,84 @@ class ToppsAccountGenerator(Browser):
 
     async def _is_cf_challenge_present(self) -> bool:
         """Check if Cloudflare challenge is still on the page."""
-        cf_indicators = [
-            "#challenge-running",
-            "#challenge-stage",
-            "iframe[src*='challenges.cloudflare.com']",
-        ]
-        for selector in cf_indicators:
-            try:
-                elem = await asyncio.wait_for(self.tab.select(selector), timeout=1)
-                if elem:
-                    return True
-            except Exception:
-                pass
-        return False
+        try:
+            # One querySelector over the selector list instead of a timed probe per indicator
+            return bool(await asyncio.wait_for(self.tab.select(CF_CHALLENGE_SELECTOR), timeout=1))
+        except asyncio.TimeoutError:
+            return False
 
     async def _verify_cf_with_retry(self, max_attempts: int = 3) -> bool:
         """Verify Cloudflare with retry logic."""
-        for attempt in range(max_attempts):
-            try:
-                await self.tab.verify_cf()
-                await self.delay("page")
-
-                # Check if CF challenge is still present
-                if await self._is_cf_challenge_present():
-                    self._log(f"      CF still present, retrying ({attempt + 1}/{max_attempts})...")
-                    await asyncio.sleep(2)
-                    continue
-                return True
-            except Exception as e:
+
+        async def attempt() -> None:
+            await self.tab.verify_cf()
+            await self.delay("page")
+            if await self._is_cf_challenge_present():
+                raise _CheckFailed("CF still present")
+
+        def log_attempt(n: int, e: Exception) -> None:
+            if isinstance(e, _CheckFailed):
+                self._log(f"      CF still present, retrying ({n}/{max_attempts})...")
+            else:
                 self._log(f"      CF verification error: {e}")
-                if attempt < max_attempts - 1:
-                    await asyncio.sleep(2)
-        return False
+
+        try:
+            await retry(
+                attempt,
+                replace(STEP_RETRY, max_retries=max_attempts - 1),
+                "cf-verify",
+                on_retry=lambda n, _, e: log_attempt(n, e),
+            )
+            return True
+        except Exception as e:
+            log_attempt(max_attempts, e)
+            return False
 
     async def _validate_state(self, state: ToppsState) -> bool:
         """Validate current page matches expected state."""
-        validator = STATE_VALIDATORS.get(state)
-        if validator is None:
+        needles = STATE_VALIDATORS.get(state)
+        if not needles:
             return True  # No validation needed
 
         current_url = self.tab.target.url
-        return validator(current_url)
+        return any(needle in current_url for needle in needles)
 
     async def _transition_to(
         self,
         target_state: ToppsState,
         action,
         max_retries: int = 2,
+        post_delay: str = "short",
     ) -> bool:
-        """Execute action and validate we reached the target state."""
-        for attempt in range(max_retries + 1):
-            try:
-                await action()
-                await self.delay("short")
+        """Execute action, wait post_delay, and validate we reached the target state.
 
-                # Validate we're in the expected state
-                if await self._validate_state(target_state):
-                    self.state = target_state
-                    return True
+        Use post_delay="page" where the action triggers redirects, so validation sees where they land.
+        """
 
-                self._log(
-                    f"      State validation failed for {target_state.name}, retry {attempt + 1}/{max_retries + 1}"
-                )
-            except Exception as e:
-                self._log(f"      Action failed: {e}, retry {attempt + 1}/{max_retries + 1}")
+        async def attempt() -> None:
+            await action()
+            await self.delay(post_delay)
+            if not await self._validate_state(target_state):
+                raise _CheckFailed(f"State validation failed for {target_state.name}")
 
-            if attempt < max_retries:
-                await asyncio.sleep(2)
+        def log_attempt(n: int, e: Exception) -> None:
+            if isinstance(e, _CheckFailed):
+                self._log(f"      {e}, retry {n}/{max_retries + 1}")
+            else:
+                self._log(f"      Action failed: {e}, retry {n}/{max_retries + 1}")
 
-        return False
+        try:
+            await retry(
+                attempt,
+                replace(STEP_RETRY, max_retries=max_retries),
+                f"transition to {target_state.name}",
+                on_retry=lambda n, _, e: log_attempt(n, e),
+            )
+        except Exception as e:
+            log_attempt(max_retries + 1, e)
+            return False
+        self.state = target_state
+        return True
 
     async def create_account(
         self,
@@ -156,22 +179,35 @@ class ToppsAccountGenerator(Browser):
             if not await self._transition_to(
                 ToppsState.LOGIN_PAGE,
                 lambda: self.navigate("https://www.topps.com/customer/account/login"),
+                post_delay="page",
             ):
                 return False, f"Failed to load login page (state: {self.state.name})"
 
-            await self.delay("page")  # Extra wait for redirects
-
             # State: CF_CHECK_2
+            # Probe for the email field while Cloudflare settles; if it renders first, the page already passed
             self._log("      Checking for Cloudflare...")
-            if not await self._verify_cf_with_retry():
-                return False, "Cloudflare verification failed on login"
+            cf_task = asyncio.create_task(self._verify_cf_with_retry())
+            email_task = asyncio.create_task(self.select("#email"))
+            try:
+                await asyncio.wait({cf_task, email_task}, return_when=asyncio.FIRST_COMPLETED)
+                if email_task.done() and email_task.exception() is None:
+                    cf_task.cancel()
+                elif not await cf_task:
+                    return False, "Cloudflare verification failed on login"
+                try:
+                    email_input = await email_task
+                except Exception:
+                    # The probe gave up while the challenge was still up; look again now that it has cleared
+                    email_input = await self.select("#email")
+            finally:
+                cf_task.cancel()
+                email_task.cancel()
             self.state = ToppsState.CF_CHECK_2
 
             self._log(f"      Current URL: {self.tab.target.url}")
 
             # State: EMAIL_ENTRY
             self._log("[3/6] Entering email...")
-            email_input = await self.select("#email")
             await self.click(email_input)
             await self.type_text(email_input, email)
             await self.delay("short")
@@ -211,16 +247,12 @@ class ToppsAccountGenerator(Browser):
             # State: WAITING_EMAIL
             self._log("[6/6] Waiting for verification email...")
             self.state = ToppsState.WAITING_EMAIL
-            verify_link = await email_client.wait_for_link(
-                email,
-                self.VERIFY_LINK_PATTERN,
-                timeout=120,
-                poll_interval=5,
-                existing_links=existing_links,
-                sender_filter=self.FANATICS_SENDER,
-            )
-
-            if not verify_link:
+            try:
+                verify_link = await asyncio.wait_for(
+                    email_client.subscribe(email, self.VERIFY_LINK_PATTERN, self.FANATICS_SENDER, existing_links),
+                    timeout=120,
+                )
+            except asyncio.TimeoutError:
                 return False, "Verification email not received"
 
             # State: VERIFICATION_LINK
@@ -229,11 +261,10 @@ class ToppsAccountGenerator(Browser):
             if not await self._transition_to(
                 ToppsState.VERIFICATION_LINK,
                 lambda: self.navigate(verify_link),
+                post_delay="page",
             ):
                 return False, "Failed to navigate to verification link"
 
-            await self.delay("page")  # Extra wait
-
             # State: COMPLETE
             self._log(f"      Final URL: {self.tab.target.url}")
             self.state = ToppsState.COMPLETE
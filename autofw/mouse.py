@@ -1,5 +1,4 @@
 import math
-import random
 from dataclasses import dataclass
 
 import numpy as np
@@ -18,18 +17,19 @@ class MouseConfig:
 
 
 class HumanMouse:
-    def __init__(self, config: MouseConfig | None = None):
+    def __init__(self, config: MouseConfig | None = None, rng: np.random.Generator | None = None):
         self.config = config or MouseConfig()
+        self.rng = rng or np.random.default_rng()
 
     def generate_path(self, start_x: float, start_y: float, end_x: float, end_y: float) -> list[tuple[float, float]]:
         distance = math.sqrt((end_x - start_x) ** 2 + (end_y - start_y) ** 2)
         if distance < 1:
             return [(end_x, end_y)]
 
-        num_nodes = random.randint(self.config.min_nodes, self.config.max_nodes)
+        num_nodes = int(self.rng.integers(self.config.min_nodes, self.config.max_nodes, endpoint=True))
         variance = min(distance * self.config.variance_factor, self.config.max_variance)
 
-        if random.random() < self.config.zigzag_probability:
+        if self.rng.random() < self.config.zigzag_probability:
             control_points = self._generate_zigzag_points(start_x, start_y, end_x, end_y, num_nodes, variance)
         else:
             control_points = self._generate_curved_points(start_x, start_y, end_x, end_y, num_nodes, variance)
@@ -40,9 +40,10 @@ class HumanMouse:
     ) -> list[tuple[float, float]]:
         x_coords = np.linspace(start_x, end_x, num_nodes)
         y_coords = np.linspace(start_y, end_y, num_nodes)
-        for i in range(1, num_nodes - 1):
-            x_coords[i] += random.uniform(-variance, variance)
-            y_coords[i] += random.uniform(-variance, variance)
+        # Draw the noise for every interior node in one call; a single node has none
+        offset_x, offset_y = self.rng.uniform(-variance, variance, size=(2, max(num_nodes - 2, 0)))
+        x_coords[1:-1] += offset_x
+        y_coords[1:-1] += offset_y
         return list(zip(x_coords, y_coords))
 
     def _generate_curved_points(
@@ -50,8 +51,7 @@ class HumanMouse:
     ) -> list[tuple[float, float]]:
         x_coords = np.linspace(start_x, end_x, num_nodes)
         y_coords = np.linspace(start_y, end_y, num_nodes)
-        offset_x = np.random.normal(0, variance * 0.5, num_nodes)
-        offset_y = np.random.normal(0, variance * 0.5, num_nodes)
+        offset_x, offset_y = self.rng.normal(0, variance * 0.5, size=(2, num_nodes))
         offset_x[0] = offset_x[-1] = 0
         offset_y[0] = offset_y[-1] = 0
         return list(zip(x_coords + offset_x, y_coords + offset_y))
@@ -80,18 +80,15 @@ class HumanMouse:
         if len(path) < 2:
             return [0]
 
-        total_distance = sum(
-            math.sqrt((path[i][0] - path[i - 1][0]) ** 2 + (path[i][1] - path[i - 1][1]) ** 2)
-            for i in range(1, len(path))
-        )
+        segment_dists = np.hypot(*np.diff(np.asarray(path, dtype=float), axis=0).T)
+        total_distance = float(segment_dists.sum())
 
-        exponent = random.uniform(1.1, 1.75)
-        adjustment = random.uniform(1.1, 1.75)
+        exponent, adjustment = self.rng.uniform(1.1, 1.75, size=2)
         base_duration = max(100, min(((total_distance**exponent) / adjustment) * self.config.speed_factor, 2000))
 
-        delays = []
-        for i in range(1, len(path)):
-            segment_dist = math.sqrt((path[i][0] - path[i - 1][0]) ** 2 + (path[i][1] - path[i - 1][1]) ** 2)
-            proportion = segment_dist / total_distance if total_distance > 0 else 1 / len(path)
-            delays.append(base_duration * proportion * random.uniform(0.8, 1.2))
-        return delays
+        if total_distance > 0:
+            proportions = segment_dists / total_distance
+        else:
+            proportions = np.full(len(segment_dists), 1 / len(path))
+        jitter = self.rng.uniform(0.8, 1.2, size=len(segment_dists))
+        return (base_duration * proportions * jitter).tolist()
@@ -0,0 +1,104 @@
+import asyncio
+
+from autofw.browser import Browser, BrowserConfig
+from autofw.retry import RetryConfig, retry
+
+
+class BrowserPool:
+    """Pre-launched browsers reused across sessions, recycled after max_uses or a failure."""
+
+    def __init__(
+        self,
+        size: int,
+        max_uses: int = 50,
+        config: BrowserConfig | None = None,
+        retry_config: RetryConfig | None = None,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.config = config or BrowserConfig()
+        self.retry_config = retry_config or RetryConfig()
+        # None is a sentinel: every slot failed to relaunch and acquire() must give up
+        self._idle: asyncio.Queue[Browser | None] = asyncio.Queue()
+        self._uses: dict[Browser, int] = {}
+        self._relaunches: set[asyncio.Task] = set()
+        self._live = 0  # Slots backed by a browser: idle, in use, or being relaunched
+        self._launch_error: Exception | None = None
+
+    async def start(self) -> None:
+        """Launch all browsers up front so no acquirer pays for startup."""
+        launched = await asyncio.gather(*(self._launch() for _ in range(self.size)), return_exceptions=True)
+        errors = [result for result in launched if isinstance(result, BaseException)]
+        if errors:
+            # Don't leak the browsers that did come up
+            for result in launched:
+                if isinstance(result, Browser):
+                    self._uses.pop(result, None)
+                    try:
+                        await result.stop()
+                    except Exception:
+                        pass  # Surface the launch error instead
+            raise errors[0]
+        for browser in launched:
+            self._idle.put_nowait(browser)
+        self._live = self.size
+
+    async def close(self) -> None:
+        """Wait for pending relaunches, then stop every idle browser."""
+        await asyncio.gather(*self._relaunches, return_exceptions=True)
+        while not self._idle.empty():
+            browser = self._idle.get_nowait()
+            if browser is not None:
+                self._uses.pop(browser, None)
+                await browser.stop()
+
+    async def acquire(self) -> Browser:
+        """Wait for an idle browser; hand it back with release().
+
+        Raises RuntimeError once every slot has failed to relaunch.
+        """
+        browser = await self._idle.get()
+        if browser is None:
+            self._idle.put_nowait(None)  # Pass the sentinel on to the next waiter
+            raise RuntimeError("no browsers left in the pool") from self._launch_error
+        return browser
+
+    async def release(self, browser: Browser, failed: bool = False) -> None:
+        """Return a browser to the pool, or replace it if it reached max_uses.
+
+        Pass failed=True only when the browser itself broke (start, attach or stop raised),
+        not when the session merely failed; a healthy browser is worth keeping.
+        """
+        self._uses[browser] += 1
+        if failed or self._uses[browser] >= self.max_uses:
+            # Relaunch in the background so the next acquirer doesn't wait on startup
+            task = asyncio.create_task(self._relaunch(browser))
+            self._relaunches.add(task)
+            task.add_done_callback(self._relaunches.discard)
+        else:
+            self._idle.put_nowait(browser)
+
+    async def _launch(self) -> Browser:
+        async def launch() -> Browser:
+            browser = Browser(self.config)
+            await browser.start()
+            return browser
+
+        browser = await retry(launch, self.retry_config, "launch browser")
+        self._uses[browser] = 0
+        return browser
+
+    async def _relaunch(self, browser: Browser) -> None:
+        self._uses.pop(browser, None)
+        try:
+            await browser.stop()
+        except Exception:
+            pass  # It is being replaced either way
+        try:
+            self._idle.put_nowait(await self._launch())
+        except Exception as e:
+            # The slot is gone for good; once none are left, unblock every acquirer
+            self._launch_error = e
+            self._live -= 1
+            if self._live == 0:
+                self._idle.put_nowait(None)
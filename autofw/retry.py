@@ -1,5 +1,5 @@
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Awaitable, Callable, TypeVar
 
 T = TypeVar("T")
@@ -11,6 +11,15 @@ class RetryConfig:
     base_delay: float = 1.0
     max_delay: float = 10.0
     exponential: bool = True
+    _delays: tuple[float, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # The whole backoff schedule, so retry() just indexes it
+        if self.exponential:
+            delays = tuple(min(self.base_delay * (1 << a), self.max_delay) for a in range(self.max_retries))
+        else:
+            delays = (self.base_delay,) * self.max_retries
+        object.__setattr__(self, "_delays", delays)
 
 
 async def retry(
@@ -21,6 +30,8 @@ async def retry(
 ) -> T:
     """Execute an async operation with retry logic and exponential backoff."""
     cfg = config or RetryConfig()
+    if cfg.max_retries == 0:
+        return await operation()
     last_error: Exception | None = None
 
     for attempt in range(cfg.max_retries + 1):
@@ -29,9 +40,9 @@ async def retry(
         except Exception as e:
             last_error = e
             if attempt < cfg.max_retries:
-                delay = min(cfg.base_delay * (2**attempt), cfg.max_delay) if cfg.exponential else cfg.base_delay
                 if on_retry:
                     on_retry(attempt + 1, cfg.max_retries, e)
-                await asyncio.sleep(delay)
+                await asyncio.sleep(cfg._delays[attempt])
 
-    raise last_error  # type: ignore[misc]
+    assert last_error is not None
+    raise last_error
@@ -1,14 +1,17 @@
 import asyncio
-import random
 from dataclasses import dataclass
 
+import numpy as np
+
 from autofw.delays import SPEED_PROFILES
 
+_RNG = np.random.default_rng()
+
 
 @dataclass(frozen=True)
 class TypingConfig:
     speed: str = "normal"
-    punctuation_chars: str = ".,@!?-_"
+    punctuation_chars: frozenset[str] | str = frozenset(".,@!?-_")
     punctuation_delay: tuple[float, float] = (0.05, 0.15)
     pause_probability: float = 0.03
     pause_duration: tuple[float, float] = (0.2, 0.5)
@@ -22,22 +25,31 @@ async def human_type(
     text: str,
     config: TypingConfig | None = None,
     speed_multiplier: float = 1.0,
+    rng: np.random.Generator | None = None,
 ) -> None:
     """Type text character-by-character with human-like delays."""
     cfg = config or TypingConfig()
+    rng = rng or _RNG
     base_min, base_max = SPEED_PROFILES.get(cfg.speed, SPEED_PROFILES["normal"])
 
-    for i, char in enumerate(text):
+    # Accept a plain string too; frozenset() of a frozenset is a no-op
+    punc = frozenset(cfg.punctuation_chars)
+
+    # Draw every keystroke's delay up front in a few vectorized calls
+    n = len(text)
+    delays = rng.uniform(base_min, base_max, n)
+    punc_mask = np.fromiter((char in punc for char in text), dtype=bool, count=n)
+    delays += rng.uniform(*cfg.punctuation_delay, n) * punc_mask
+    delays += rng.uniform(*cfg.pause_duration, n) * (rng.random(n) < cfg.pause_probability)
+    accelerated = (np.arange(n) > cfg.acceleration_threshold) & (rng.random(n) < cfg.acceleration_probability)
+    delays[accelerated] *= cfg.acceleration_factor
+    delays /= speed_multiplier
+
+    loop = asyncio.get_running_loop()
+    for char, delay in zip(text, delays.tolist()):
+        sent_at = loop.time()
         await element.send_keys(char)
-        delay = random.uniform(base_min, base_max)
-
-        if char in cfg.punctuation_chars:
-            delay += random.uniform(*cfg.punctuation_delay)
-
-        if random.random() < cfg.pause_probability:
-            delay += random.uniform(*cfg.pause_duration)
-
-        if i > cfg.acceleration_threshold and random.random() < cfg.acceleration_probability:
-            delay *= cfg.acceleration_factor
-
-        await asyncio.sleep(delay / speed_multiplier)
+        # Keystroke-to-keystroke spacing is the delay, so the CDP round-trip counts towards it
+        remaining = delay - (loop.time() - sent_at)
+        if remaining > 0:
+            await asyncio.sleep(remaining)